@@ -2,12 +2,17 @@
 from __future__ import annotations
 
 import argparse
+import errno
 import os
 import re
 import shutil
+import stat
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from pathlib import Path
+from functools import lru_cache, partial
+from pathlib import Path, PurePath
+from typing import Iterator
 
 
 MULTIPART_EXTENSIONS = (
@@ -27,74 +32,141 @@ def _is_relative_to(path: Path, other: Path) -> bool:
         return False
 
 
-def normalize_type_name(file_path: Path) -> str:
-    name = file_path.name
-    lower = name.lower()
+@lru_cache(maxsize=1024)
+def _type_from_suffixes(suffixes: str) -> str:
+    # `suffixes` is the lowercased name from its first dot on (".jpg", ".tar.gz", ".v2.pdf"),
+    # so files sharing an extension share a cache entry.
+    for ext in MULTIPART_EXTENSIONS:
+        if suffixes.endswith(ext):
+            return ext.lstrip(".")
+
+    suffix = suffixes[suffixes.rfind(".") + 1 :]
+    return suffix or "no-extension"
+
 
+def normalize_type_name(name: str) -> str:
     if name.startswith(".") and name.count(".") == 1:
         return "dotfile"
 
-    for ext in MULTIPART_EXTENSIONS:
-        if lower.endswith(ext):
-            return ext.lstrip(".")
-
-    suffix = file_path.suffix.lower()
-    if not suffix:
+    dot = name.find(".")
+    if dot == -1:
         return "no-extension"
-    return suffix.lstrip(".")
+    return _type_from_suffixes(name[dot:].lower())
 
 
 _SAFE_FOLDER_RE = re.compile(r"[^a-zA-Z0-9._-]+")
 
 
+@lru_cache(maxsize=1024)
 def sanitize_folder_name(type_name: str) -> str:
     cleaned = _SAFE_FOLDER_RE.sub("_", type_name.strip())
     cleaned = cleaned.strip("._-")
     return cleaned or "unknown"
 
 
-def unique_destination_path(dest_path: Path) -> Path:
-    if not dest_path.exists():
+def list_taken_names(directory: str) -> set[str]:
+    try:
+        with os.scandir(directory) as it:
+            return {entry.name for entry in it}
+    except FileNotFoundError:
+        return set()
+
+
+def unique_destination_path(dest_path: str, taken: set[str]) -> str:
+    parent, name = os.path.split(dest_path)
+    if name not in taken:
+        taken.add(name)
         return dest_path
 
-    stem = dest_path.stem
-    suffix = dest_path.suffix
-    parent = dest_path.parent
+    stem = PurePath(name).stem
+    suffix = PurePath(name).suffix
     for i in range(1, 10_000):
-        candidate = parent / f"{stem}_{i}{suffix}"
-        if not candidate.exists():
-            return candidate
+        candidate = f"{stem}_{i}{suffix}"
+        if candidate not in taken:
+            taken.add(candidate)
+            return os.path.join(parent, candidate)
 
     raise RuntimeError(f"Unable to find a free filename for: {dest_path}")
 
 
 @dataclass(frozen=True)
 class MovePlan:
-    source: Path
-    dest: Path
+    source: str
+    dest: str
     action: str  # "move" | "copy"
 
 
-def iter_source_files(source_dir: Path, recursive: bool) -> list[Path]:
-    if recursive:
-        files: list[Path] = []
-        for root, dirs, filenames in os.walk(source_dir):
-            root_path = Path(root)
-            dirs[:] = [d for d in dirs if not (root_path / d).is_symlink()]
-            for filename in filenames:
-                p = root_path / filename
-                if p.is_file() or p.is_symlink():
-                    files.append(p)
-        return files
+# Unmeasured heuristic: when a level of the source tree has only a few folders, scanning
+# them inline is about as fast as queuing them to the --jobs threads.
+_PARALLEL_MIN_DIRS = 8
 
-    return [
-        p
-        for p in source_dir.iterdir()
-        if (p.is_file() or p.is_symlink()) and not p.is_dir()
-    ]
 
+def _scan_dir(directory: str, recursive: bool, is_root: bool = False) -> tuple[list[str], list[str]]:
+    files: list[str] = []
+    subdirs: list[str] = []
+    try:
+        it = os.scandir(directory)
+    except OSError:
+        # Unreadable subfolders are skipped like os.walk does; an unreadable source is an error.
+        if is_root:
+            raise
+        return files, subdirs
+
+    with it:
+        for entry in it:
+            # The type comes from readdir for free; only symlinks cost a stat, to see if they point at a folder.
+            if entry.is_dir():
+                if recursive and not entry.is_symlink():
+                    subdirs.append(entry.path)
+                continue
+            if entry.is_file() or entry.is_symlink():
+                files.append(entry.path)
+    return files, subdirs
+
+
+def _scan(directory: str, recursive: bool, is_root: bool = False) -> Iterator[str]:
+    files, subdirs = _scan_dir(directory, recursive=recursive, is_root=is_root)
+    yield from files
+    for subdir in subdirs:
+        yield from _scan(subdir, recursive=True)
+
+
+def _scan_parallel(source_dir: str, jobs: int) -> list[str]:
+    scanned: dict[str, tuple[list[str], list[str]]] = {}
+    scanned[source_dir] = _scan_dir(source_dir, recursive=True, is_root=True)
+    frontier = list(scanned[source_dir][1])
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while frontier:
+            if len(frontier) < _PARALLEL_MIN_DIRS:
+                results = [_scan_dir(d, recursive=True) for d in frontier]
+            else:
+                results = pool.map(partial(_scan_dir, recursive=True), frontier)
+            next_frontier: list[str] = []
+            for directory, result in zip(frontier, results):
+                scanned[directory] = result
+                next_frontier.extend(result[1])
+            frontier = next_frontier
+
+    # Replay the per-folder results depth-first so files come out in _scan's order.
+    files: list[str] = []
+    stack = [source_dir]
+    while stack:
+        dir_files, subdirs = scanned[stack.pop()]
+        files.extend(dir_files)
+        stack.extend(reversed(subdirs))
+    return files
+
+
+def iter_source_files(source_dir: Path, recursive: bool, jobs: int = 1) -> Iterator[str]:
+    if recursive and jobs > 1:
+        yield from _scan_parallel(str(source_dir), jobs=jobs)
+        return
+    yield from _scan(str(source_dir), recursive=recursive, is_root=True)
 
-def build_plans(source_dir: Path, dest_root: Path, recursive: bool, action: str) -> list[MovePlan]:
+
+def build_plans(
+    source_dir: Path, dest_root: Path, recursive: bool, action: str, jobs: int = 1
+) -> list[MovePlan]:
     source_dir = source_dir.resolve()
     dest_root = dest_root.resolve()
 
@@ -103,31 +175,98 @@ def build_plans(source_dir: Path, dest_root: Path, recursive: bool, action: str)
             "--recursive requires --dest outside the source directory (to avoid re-sorting moved files)."
         )
 
-    plans: list[MovePlan] = []
-    for file_path in iter_source_files(source_dir, recursive=recursive):
-        type_name = sanitize_folder_name(normalize_type_name(file_path))
-        dest_dir = dest_root / type_name
-        dest_path = dest_dir / file_path.name
+    # The walk starts at the resolved source_dir and never follows symlinked folders, so every
+    # file's parent is already a real path. Only the type folders need resolving, once each.
+    # Paths stay plain strings in this loop; Path objects are built once per type folder.
+    type_dirs: dict[str, tuple[str, str]] = {}  # type_name -> (dest_dir, real dest_dir)
 
-        if file_path.resolve().parent == dest_dir.resolve():
+    plans: list[MovePlan] = []
+    for file_path in iter_source_files(source_dir, recursive=recursive, jobs=jobs):
+        parent, name = os.path.split(file_path)
+        type_name = sanitize_folder_name(normalize_type_name(name))
+
+        dirs = type_dirs.get(type_name)
+        if dirs is None:
+            dest_dir = dest_root / type_name
+            dirs = type_dirs[type_name] = (str(dest_dir), str(dest_dir.resolve()))
+        if parent == dirs[1]:
             continue
 
-        plans.append(MovePlan(source=file_path, dest=dest_path, action=action))
+        plans.append(MovePlan(source=file_path, dest=os.path.join(dirs[0], name), action=action))
 
     return plans
 
 
-def ensure_dir(path: Path, dry_run: bool) -> None:
+def ensure_dir(path: str, dry_run: bool) -> None:
     if dry_run:
         return
-    path.mkdir(parents=True, exist_ok=True)
+    os.makedirs(path, exist_ok=True)
 
 
-def execute_plans(plans: list[MovePlan], dry_run: bool, verbose: bool) -> int:
+def same_filesystem(source_dir: Path, dest_root: Path) -> bool:
+    # dest_root may not exist yet; it will be created on its nearest existing ancestor's device.
+    while not dest_root.exists() and dest_root != dest_root.parent:
+        dest_root = dest_root.parent
+    try:
+        return os.stat(source_dir).st_dev == os.stat(dest_root).st_dev
+    except OSError:
+        return False
+
+
+def move_file(source: str, dest: str, same_fs: bool) -> None:
+    if same_fs:
+        try:
+            os.rename(source, dest)
+            return
+        except OSError as e:
+            # A mount point inside a recursive source can still cross devices.
+            if e.errno != errno.EXDEV:
+                raise
+    shutil.move(source, dest)
+
+
+def copy_file(source: str, dest: str) -> None:
+    # copy_file_range copies inside the kernel and can reflink, but only within one filesystem.
+    # Cross-device copies, other platforms and special files use shutil.copy2, which has its own
+    # zero-copy sendfile path on Linux.
+    st = os.stat(source)
+    if (
+        not hasattr(os, "copy_file_range")
+        or not stat.S_ISREG(st.st_mode)
+        or st.st_dev != os.stat(os.path.dirname(dest)).st_dev
+    ):
+        shutil.copy2(source, dest)
+        return
+
+    copied = 0
+    try:
+        with open(source, "rb") as fsrc, open(dest, "wb") as fdst:
+            while True:
+                n = os.copy_file_range(fsrc.fileno(), fdst.fileno(), 1 << 30)
+                if not n:
+                    break
+                copied += n
+    except OSError:
+        # e.g. a filesystem without copy_file_range support; copy2 rewrites dest from scratch.
+        shutil.copy2(source, dest)
+        return
+    if copied != st.st_size:
+        # Some FUSE/overlay/network mounts report 0 before the real end of file.
+        shutil.copy2(source, dest)
+        return
+    shutil.copystat(source, dest)
+
+
+def execute_plans(plans: list[MovePlan], dry_run: bool, verbose: bool, same_fs: bool = False) -> int:
     moved = 0
+    taken_names: dict[str, set[str]] = {}
     for plan in plans:
-        ensure_dir(plan.dest.parent, dry_run=dry_run)
-        final_dest = unique_destination_path(plan.dest)
+        dest_dir = os.path.dirname(plan.dest)
+        taken = taken_names.get(dest_dir)
+        if taken is None:
+            ensure_dir(dest_dir, dry_run=dry_run)
+            taken = taken_names[dest_dir] = list_taken_names(dest_dir)
+        final_dest = unique_destination_path(plan.dest, taken)
 
         if verbose or dry_run:
             print(f"{plan.action.upper()}: {plan.source} -> {final_dest}")
@@ -137,9 +276,9 @@ def execute_plans(plans: list[MovePlan], dry_run: bool, verbose: bool) -> int:
             continue
 
         if plan.action == "move":
-            shutil.move(str(plan.source), str(final_dest))
+            move_file(plan.source, final_dest, same_fs=same_fs)
         elif plan.action == "copy":
-            shutil.copy2(str(plan.source), str(final_dest))
+            copy_file(plan.source, final_dest)
         else:
             raise ValueError(f"Unknown action: {plan.action}")
 
@@ -163,6 +302,12 @@ def parse_args(argv: list[str]) -> argparse.Namespace:
         action="store_true",
         help="Include files in subfolders (requires --dest outside source)",
     )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Threads used to scan subfolders with --recursive (default: 1)",
+    )
     parser.add_argument(
         "--copy",
         action="store_true",
@@ -196,8 +341,10 @@ def main(argv: list[str]) -> int:
     action = "copy" if args.copy else "move"
 
     try:
-        plans = build_plans(source_dir, dest_root, recursive=args.recursive, action=action)
-    except ValueError as e:
+        plans = build_plans(
+            source_dir, dest_root, recursive=args.recursive, action=action, jobs=args.jobs
+        )
+    except (ValueError, OSError) as e:
         print(f"ERROR: {e}", file=sys.stderr)
         return 2
 
@@ -206,7 +353,12 @@ def main(argv: list[str]) -> int:
             print("No files to organize.")
         return 0
 
-    moved = execute_plans(plans, dry_run=args.dry_run, verbose=args.verbose)
+    moved = execute_plans(
+        plans,
+        dry_run=args.dry_run,
+        verbose=args.verbose,
+        same_fs=action == "move" and same_filesystem(source_dir, dest_root),
+    )
     if args.verbose or args.dry_run:
         print(f"Planned/processed {moved} file(s).")
 
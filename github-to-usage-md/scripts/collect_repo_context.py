@@ -2,14 +2,15 @@
 from __future__ import annotations
 
 import argparse
+import heapq
 import os
-import re
 import subprocess
 import sys
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, Iterator
 
 
 EXCLUDE_DIRS = {
@@ -53,18 +54,21 @@ def run(cmd: list[str], cwd: Path | None = None) -> str:
     return p.stdout.strip()
 
 
+_GITHUB_HTTPS_PREFIX = "https://github.com/"
+_GIT_SSH_PREFIX = "git@github.com:"
+
+
 def is_probably_github_url(s: str) -> bool:
-    return s.startswith("https://github.com/") or s.startswith("git@github.com:")
+    return s.startswith((_GITHUB_HTTPS_PREFIX, _GIT_SSH_PREFIX))
 
 
 def normalize_github_url(url: str) -> str:
     url = url.strip()
-    if url.startswith("git@github.com:"):
+    if url.startswith(_GIT_SSH_PREFIX):
         # git@github.com:org/repo(.git)
-        path = url[len("git@github.com:") :]
-        url = f"https://github.com/{path}"
-    url = re.sub(r"\.git$", "", url)
-    return url
+        path = url[len(_GIT_SSH_PREFIX) :]
+        url = f"{_GITHUB_HTTPS_PREFIX}{path}"
+    return url.removesuffix(".git")
 
 
 def clone_repo(url: str, ref: str | None, depth: int) -> RepoContext:
@@ -74,7 +78,9 @@ def clone_repo(url: str, ref: str | None, depth: int) -> RepoContext:
     tmp_dir = Path(tempfile.mkdtemp(prefix="github-to-usage-md-"))
     repo_dir = tmp_dir / repo_name
 
-    cmd = ["git", "clone", "--depth", str(depth), norm, str(repo_dir)]
+    # Only top-level files (README, manifests) are checked out, and blobs are fetched on demand;
+    # the file tree comes from `git ls-tree`, which needs just the (small) tree objects.
+    cmd = ["git", "clone", "--depth", str(depth), "--filter=blob:none", "--sparse", norm, str(repo_dir)]
     run(cmd)
 
     head_ref = None
@@ -101,30 +107,106 @@ def open_local_repo(path_str: str) -> RepoContext:
     return RepoContext(source=str(repo_dir), repo_dir=repo_dir, repo_name=repo_name, head_ref=head_ref)
 
 
-def iter_tree(root: Path, max_depth: int) -> Iterable[str]:
-    root = root.resolve()
-    for current_root, dirs, files in os.walk(str(root)):
-        current = Path(current_root).resolve()
-        rel_dir = os.path.relpath(str(current), str(root))
-        depth = 0 if rel_dir in (".", "") else len(Path(rel_dir).parts)
-        dirs[:] = [d for d in dirs if d not in EXCLUDE_DIRS]
-        if depth > max_depth:
-            dirs[:] = []
-            continue
-        for f in files:
-            p = current / f
-            if p.is_symlink():
+# Rough cut-off, not a benchmark result: shallow repos rarely have this many folders at one
+# depth, and for them the thread hand-off isn't worth it.
+_PARALLEL_MIN_DIRS = 8
+
+
+def _scan_tree_dir(directory: str, rel_dir: str, descend: bool) -> tuple[list[str], list[tuple[str, str]]]:
+    files: list[str] = []
+    subdirs: list[tuple[str, str]] = []
+    try:
+        it = os.scandir(directory)
+    except OSError:
+        return files, subdirs
+
+    with it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                if descend and entry.name not in EXCLUDE_DIRS:
+                    subdirs.append((entry.path, os.path.join(rel_dir, entry.name)))
                 continue
-            yield os.path.relpath(str(p), str(root))
+            if entry.is_symlink():
+                continue
+            files.append(os.path.join(rel_dir, entry.name))
+    return files, subdirs
+
+
+def _scan_tree(directory: str, rel_dir: str, depth: int, max_depth: int) -> Iterator[str]:
+    files, subdirs = _scan_tree_dir(directory, rel_dir, descend=depth < max_depth)
+    yield from files
+    for path, rel in subdirs:
+        yield from _scan_tree(path, rel, depth + 1, max_depth)
+
+
+def _scan_tree_parallel(root: str, max_depth: int, jobs: int) -> list[str]:
+    scanned: dict[str, tuple[list[str], list[tuple[str, str]]]] = {}
+    frontier: list[tuple[str, str]] = [(root, "")]
+    depth = 0
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while frontier:
+            descend = depth < max_depth
+            if len(frontier) < _PARALLEL_MIN_DIRS:
+                results = [_scan_tree_dir(path, rel, descend) for path, rel in frontier]
+            else:
+                results = pool.map(lambda d: _scan_tree_dir(d[0], d[1], descend), frontier)
+            next_frontier: list[tuple[str, str]] = []
+            for (path, _), result in zip(frontier, results):
+                scanned[path] = result
+                next_frontier.extend(result[1])
+            frontier = next_frontier
+            depth += 1
+
+    # _scan_tree lists a folder's files before descending into its subfolders; rebuild that order.
+    out: list[str] = []
+    stack = [root]
+    while stack:
+        files, subdirs = scanned[stack.pop()]
+        out.extend(files)
+        stack.extend(path for path, _ in reversed(subdirs))
+    return out
 
 
-def format_tree(root: Path, max_depth: int, max_entries: int) -> list[str]:
-    entries: list[str] = []
-    for rel in sorted(iter_tree(root, max_depth=max_depth), key=lambda x: str(x).lower()):
-        entries.append(str(rel))
-        if len(entries) >= max_entries:
-            break
-    return entries
+def _git_tracked_tree(root: Path, max_depth: int) -> list[str] | None:
+    # One read of HEAD's tree instead of a filesystem walk; git already knows what is tracked.
+    try:
+        out = run(["git", "ls-tree", "-r", "-z", "HEAD"], cwd=root)
+    except Exception:
+        return None
+
+    files: list[str] = []
+    for record in out.split("\0"):
+        if not record:
+            continue
+        meta, _, path = record.partition("\t")
+        if meta.startswith(("120000 ", "160000 ")):
+            # symlinks and submodules, which the filesystem walk skips too
+            continue
+        dirs = path.split("/")[:-1]
+        if len(dirs) > max_depth or not EXCLUDE_DIRS.isdisjoint(dirs):
+            continue
+        files.append(path)
+    return files
+
+
+def iter_tree(root: Path, max_depth: int, jobs: int = 1) -> Iterator[str]:
+    root = root.resolve()
+    if max_depth < 0:
+        return
+    if (root / ".git").exists():
+        tracked = _git_tracked_tree(root, max_depth=max_depth)
+        if tracked is not None:
+            yield from tracked
+            return
+    if jobs > 1:
+        yield from _scan_tree_parallel(str(root), max_depth=max_depth, jobs=jobs)
+        return
+    yield from _scan_tree(str(root), "", 0, max_depth)
+
+
+def format_tree(root: Path, max_depth: int, max_entries: int, jobs: int = 1) -> list[str]:
+    # Keeps only the first max_entries in sorted order: O(N log K) rather than sorting everything.
+    return heapq.nsmallest(max_entries, iter_tree(root, max_depth=max_depth, jobs=jobs), key=str.lower)
 
 
 def find_first_existing(root: Path, candidates: Iterable[str]) -> Path | None:
@@ -137,7 +219,10 @@ def find_first_existing(root: Path, candidates: Iterable[str]) -> Path | None:
 
 def read_text_snippet(path: Path, max_chars: int) -> str:
     try:
-        data = path.read_text(encoding="utf-8", errors="replace")
+        # Text-mode read(n) decodes incrementally, so only the head of a huge file is loaded.
+        # The slack leaves room for leading/trailing whitespace that strip() drops.
+        with path.open(encoding="utf-8", errors="replace") as f:
+            data = f.read(max_chars + 1024)
     except Exception:
         return ""
     data = data.strip()
@@ -146,36 +231,37 @@ def read_text_snippet(path: Path, max_chars: int) -> str:
     return data
 
 
-SECTION_HEADER_RE = re.compile(r"^(#{1,6})\s+(.*)\s*$")
-
-
 def extract_markdown_sections(md: str, wanted_titles: set[str], max_chars: int) -> dict[str, str]:
     wanted = {t.lower().strip() for t in wanted_titles}
-    current_title: str | None = None
+    current_key: str | None = None
     current_lines: list[str] = []
     out: dict[str, str] = {}
 
     def flush() -> None:
-        nonlocal current_title, current_lines
-        if current_title is None:
+        nonlocal current_key, current_lines
+        if current_key is None:
             return
-        key = current_title.lower().strip()
-        if key in wanted and key not in out:
+        if current_key in wanted and current_key not in out:
             text = "\n".join(current_lines).strip()
             if len(text) > max_chars:
                 text = text[:max_chars].rstrip() + "\n…(truncated)"
-            out[key] = text
-        current_title = None
+            out[current_key] = text
+        current_key = None
         current_lines = []
 
-    for line in md.splitlines():
-        m = SECTION_HEADER_RE.match(line)
-        if m:
-            flush()
-            current_title = m.group(2)
-            current_lines = [line]
-            continue
-        if current_title is not None:
+    # md comes from a text-mode read, so newlines are already normalized to "\n".
+    for line in md.split("\n"):
+        # ATX header: 1-6 '#' followed by whitespace. Body lines fail the first-char test cheaply.
+        if line[:1] == "#":
+            title = line.lstrip("#")
+            if len(line) - len(title) <= 6 and title[:1].isspace():
+                flush()
+                if len(out) == len(wanted):
+                    break
+                current_key = title.strip().lower()
+                current_lines = [line]
+                continue
+        if current_key is not None:
             current_lines.append(line)
 
     flush()
@@ -210,6 +296,13 @@ def parse_args(argv: list[str]) -> argparse.Namespace:
     p.add_argument("--out", default="REPO_CONTEXT.md", help="Output markdown path (default: REPO_CONTEXT.md)")
     p.add_argument("--max-depth", type=int, default=2, help="Tree listing max depth (default: 2)")
     p.add_argument("--max-entries", type=int, default=300, help="Max tree entries (default: 300)")
+    p.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Threads used to scan the file tree of non-git directories; git checkouts are listed "
+        "with `git ls-tree` and ignore this (default: 1)",
+    )
     p.add_argument("--max-readme-chars", type=int, default=12_000, help="Max chars to include from README (default: 12000)")
     p.add_argument("--max-section-chars", type=int, default=6_000, help="Max chars per extracted section (default: 6000)")
     p.add_argument(
@@ -254,7 +347,7 @@ def main(argv: list[str]) -> int:
     }
     extracted = extract_markdown_sections(readme_text, wanted_titles=wanted, max_chars=args.max_section_chars) if readme_text else {}
 
-    tree = format_tree(root, max_depth=args.max_depth, max_entries=args.max_entries)
+    tree = format_tree(root, max_depth=args.max_depth, max_entries=args.max_entries, jobs=args.jobs)
     stack = detect_stack(root)
 
     out_path = Path(args.out).expanduser().resolve()
@@ -271,14 +364,13 @@ def main(argv: list[str]) -> int:
     if stack:
         lines.append("## Detected Stack")
         lines.append("")
-        for s in stack:
-            lines.append(f"- {s}")
+        lines.append("\n".join(f"- {s}" for s in stack))
         lines.append("")
 
     lines.append("## File Tree (partial)")
     lines.append("")
     lines.append("```")
-    lines.extend(tree if tree else ["(empty)"])
+    lines.append("\n".join(tree) if tree else "(empty)")
     lines.append("```")
     lines.append("")
 
@@ -303,7 +395,7 @@ def main(argv: list[str]) -> int:
             lines.append("```")
             lines.append("")
 
-    out_path.write_text("\n".join(lines).rstrip() + "\n", encoding="utf-8")
+    out_path.write_bytes(("\n".join(lines).rstrip() + "\n").encode("utf-8"))
     print(str(out_path))
 
     if tmp_to_cleanup and not args.keep_clone:
@@ -2,10 +2,14 @@
 from __future__ import annotations
 
 import math
+import shutil
+import subprocess
+from bisect import bisect_left
 from dataclasses import dataclass
+from itertools import accumulate
 from pathlib import Path
 
-from PIL import Image, ImageDraw, ImageFilter
+from PIL import Image, ImageDraw
 
 
 @dataclass(frozen=True)
@@ -22,11 +26,35 @@ def lerp(a: float, b: float, t: float) -> float:
     return a + (b - a) * t
 
 
+def blend(base: tuple[int, int, int], over: tuple[int, int, int], alpha: int) -> tuple[int, int, int]:
+    return tuple(round(lerp(b, o, alpha / 255.0)) for b, o in zip(base, over))
+
+
+BG_COLOR = (248, 250, 252)
+GROUND_COLOR = (220, 224, 230)
+BALL_COLOR = (255, 59, 48)
+SHADOW_ALPHAS = (10, 20, 30, 45, 60, 75, 90)  # black over the background, lightest first
+
+# Every color in the scene, so frames are drawn as palette indices with no quantization step.
+BG_INDEX, GROUND_INDEX, BALL_INDEX, HIGHLIGHT_INDEX, SHADE_INDEX = range(5)
+SHADOW_INDEX = 5
+PALETTE_COLORS = [
+    BG_COLOR,
+    GROUND_COLOR,
+    BALL_COLOR,
+    blend(BG_COLOR, (255, 255, 255), 120),
+    blend(BALL_COLOR, (0, 0, 0), 20),  # shading ring; a soft alpha-40 edge averages out to about this
+    *(blend(BG_COLOR, (0, 0, 0), a) for a in SHADOW_ALPHAS),
+]
+PALETTE = [channel for color in PALETTE_COLORS for channel in color]
+
+
 def ease_in_out_cubic(t: float) -> float:
     t = clamp(t, 0.0, 1.0)
     if t < 0.5:
         return 4.0 * t * t * t
-    return 1.0 - pow(-2.0 * t + 2.0, 3.0) / 2.0
+    u = -2.0 * t + 2.0
+    return 1.0 - u * u * u * 0.5
 
 
 def build_bounce_segments(total_duration: float) -> list[Segment]:
@@ -52,21 +80,29 @@ def build_bounce_segments(total_duration: float) -> list[Segment]:
     return segments
 
 
-def bounce_center_y(t: float, segments: list[Segment], ground_y: float, radius: float) -> float:
-    t = clamp(t, 0.0, 1.0)
-    total = sum(s.duration for s in segments)
-    time = t * total
-    cursor = 0.0
-
-    for segment in segments:
-        if cursor + segment.duration >= time:
-            local = (time - cursor) / max(segment.duration, 1e-9)
-            local = ease_in_out_cubic(local)
-            parabola = 1.0 - (2.0 * local - 1.0) ** 2  # 0 at ends, 1 at mid
-            return (ground_y - radius) - segment.height * parabola
-        cursor += segment.duration
+def bounce_center_ys(frame_count: int, segments: list[Segment], ground_y: float, radius: float) -> list[float]:
+    # Cumulative segment end times, searched with bisect instead of a linear scan per frame.
+    ends = list(accumulate(s.duration for s in segments))
+    total = ends[-1] if ends else 0.0
+    rest_y = ground_y - radius
 
-    return ground_y - radius
+    center_ys: list[float] = []
+    for i in range(frame_count):
+        t = i / (frame_count - 1) if frame_count > 1 else 0.0
+        time = t * total
+        index = bisect_left(ends, time)
+        if index == len(ends):
+            center_ys.append(rest_y)
+            continue
+        segment = segments[index]
+        start = ends[index - 1] if index else 0.0
+        local = (time - start) / max(segment.duration, 1e-9)
+        local = ease_in_out_cubic(local)
+        p = 2.0 * local - 1.0
+        parabola = 1.0 - p * p  # 0 at ends, 1 at mid
+        center_ys.append(rest_y - segment.height * parabola)
+
+    return center_ys
 
 
 def render_frame(
@@ -78,30 +114,29 @@ def render_frame(
     contact: float,
 ) -> Image.Image:
     width, height = size
-    bg = Image.new("RGBA", (width, height), (248, 250, 252, 255))
+    frame = Image.new("P", (width, height), BG_INDEX)
+    frame.putpalette(PALETTE)
 
-    draw = ImageDraw.Draw(bg)
+    draw = ImageDraw.Draw(frame)
 
     # Ground line
-    draw.line([(0, ground_y + 0.5), (width, ground_y + 0.5)], fill=(220, 224, 230, 255), width=2)
+    draw.line([(0, ground_y + 0.5), (width, ground_y + 0.5)], fill=GROUND_INDEX, width=2)
 
-    # Shadow (bigger & darker near contact)
+    # Shadow (bigger & darker near contact), softened with lighter rings instead of a blur
     shadow_max_w = radius * 2.2
     shadow_min_w = radius * 1.0
     shadow_w = lerp(shadow_min_w, shadow_max_w, contact)
     shadow_h = lerp(radius * 0.22, radius * 0.34, contact)
-    shadow_alpha = int(lerp(30, 90, contact))
-    shadow = Image.new("RGBA", (width, height), (0, 0, 0, 0))
-    shadow_draw = ImageDraw.Draw(shadow)
-    shadow_box = (
-        x - shadow_w / 2.0,
-        ground_y - shadow_h / 2.0,
-        x + shadow_w / 2.0,
-        ground_y + shadow_h / 2.0,
-    )
-    shadow_draw.ellipse(shadow_box, fill=(0, 0, 0, shadow_alpha))
-    shadow = shadow.filter(ImageFilter.GaussianBlur(radius=2))
-    bg.alpha_composite(shadow)
+    shadow_alpha = lerp(30, 90, contact)
+    shadow_level = min(range(len(SHADOW_ALPHAS)), key=lambda i: abs(SHADOW_ALPHAS[i] - shadow_alpha))
+    for grow, fade in ((1.5, 2), (0.75, 1), (0.0, 0)):
+        shadow_box = (
+            x - shadow_w / 2.0 - grow,
+            ground_y - shadow_h / 2.0 - grow,
+            x + shadow_w / 2.0 + grow,
+            ground_y + shadow_h / 2.0 + grow,
+        )
+        draw.ellipse(shadow_box, fill=SHADOW_INDEX + max(shadow_level - fade, 0))
 
     # Ball squish
     xscale = 1.0 + 0.25 * contact
@@ -110,28 +145,20 @@ def render_frame(
     ry = radius * yscale
     center_y = center_y_no_squish + (radius - ry) * contact
 
-    ball = Image.new("RGBA", (width, height), (0, 0, 0, 0))
-    ball_draw = ImageDraw.Draw(ball)
     ball_box = (x - rx, center_y - ry, x + rx, center_y + ry)
-    ball_color = (255, 59, 48, 255)
-    ball_draw.ellipse(ball_box, fill=ball_color)
+    draw.ellipse(ball_box, fill=BALL_INDEX)
 
     # Highlight
     hx = x - rx * 0.28
     hy = center_y - ry * 0.35
     highlight_box = (hx - rx * 0.35, hy - ry * 0.35, hx + rx * 0.05, hy + ry * 0.05)
-    ball_draw.ellipse(highlight_box, fill=(255, 255, 255, 120))
+    draw.ellipse(highlight_box, fill=HIGHLIGHT_INDEX)
 
-    # Soft shading
-    shade = Image.new("RGBA", (width, height), (0, 0, 0, 0))
-    shade_draw = ImageDraw.Draw(shade)
+    # Shading
     shade_box = (x - rx * 0.95, center_y - ry * 0.95, x + rx * 0.95, center_y + ry * 0.95)
-    shade_draw.ellipse(shade_box, outline=(0, 0, 0, 40), width=3)
-    shade = shade.filter(ImageFilter.GaussianBlur(radius=1))
-    ball.alpha_composite(shade)
+    draw.ellipse(shade_box, outline=SHADE_INDEX, width=3)
 
-    bg.alpha_composite(ball)
-    return bg.convert("P", palette=Image.Palette.ADAPTIVE, colors=256)
+    return frame
 
 
 def main() -> None:
@@ -153,9 +180,9 @@ def main() -> None:
     min_center_y = ground_y - radius
     contact_zone = radius * 0.65
 
-    for i in range(frame_count):
-        t = i / (frame_count - 1) if frame_count > 1 else 0.0
-        center_y_no_squish = bounce_center_y(t, segments, ground_y=ground_y, radius=radius)
+    # P-mode frames render in well under 0.1 ms each; a process pool's startup would cost more, so render serially.
+    center_ys = bounce_center_ys(frame_count, segments, ground_y=ground_y, radius=radius)
+    for center_y_no_squish in center_ys:
         dist_to_ground = max(0.0, min_center_y - center_y_no_squish)
         contact = clamp(1.0 - dist_to_ground / max(contact_zone, 1e-9), 0.0, 1.0)
         frames.append(
@@ -175,9 +202,14 @@ def main() -> None:
         append_images=frames[1:],
         duration=int(1000 / fps),
         loop=0,
-        optimize=True,
+        optimize=False,
         disposal=2,
     )
+    # Every frame already shares the fixed palette; gifsicle's native optimizer is much faster than
+    # Pillow's, and the unoptimized GIF is kept as-is when gifsicle isn't installed.
+    gifsicle = shutil.which("gifsicle")
+    if gifsicle:
+        subprocess.run([gifsicle, "-O3", "--batch", str(out_path)], check=False)
     print(out_path)
 
 